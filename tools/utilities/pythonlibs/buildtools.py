@@ -7,8 +7,10 @@
 #  Requires: Python 3.x
 #
 ####################################################################################################
+import io
 import json
 import os
+import signal
 import sys
 import subprocess
 from threading import Thread, Lock
@@ -221,6 +223,64 @@ class EllBuildTools:
         self.run(args, print_output=print_output)
         return out_file
 
+    def opt_and_llc_piped(self, output_dir, input_file, target, optimization_level="3", objext=".o"):
+        # opt compiled_model.bc -o - -O3 | llc - -o compiled_model.o -O3
+        # The optimized bitcode is piped straight into llc instead of being written to disk and read back.
+        model_name = os.path.splitext(os.path.basename(input_file))[0]
+        out_file = os.path.join(output_dir, model_name + objext)
+        fp_contract = '' if optimization_level == '0' else "-fp-contract=fast"
+        opt_args = [self.optexe,
+                    input_file,
+                    "-o", "-",
+                    "-O" + optimization_level,
+                    fp_contract]
+        llc_args = [self.llcexe,
+                    "-",
+                    "-o", out_file,
+                    "-O" + optimization_level,
+                    fp_contract]
+        llc_args = llc_args + self.get_llc_options(target)
+        # Save the parameters passed to opt and llc. This is used for archiving purposes.
+        self.log_command_arguments(opt_args, log_dir=output_dir)
+        self.log_command_arguments(llc_args, log_dir=output_dir)
+
+        cmdstr = " ".join(opt_args) + " | " + " ".join(llc_args)
+        if self.verbose:
+            self.logger.info(cmdstr)
+        self.logger.info("running opt | llc ...")
+        try:
+            with subprocess.Popen(opt_args, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as opt_proc, \
+                    subprocess.Popen(llc_args, stdin=opt_proc.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                     universal_newlines=True) as llc_proc:
+                # llc owns the read end of the pipe now, so opt sees a broken pipe if llc exits early
+                opt_proc.stdout.close()
+                self.output = ''
+                threads = [Thread(target=self.logstream, args=(io.TextIOWrapper(opt_proc.stderr),)),
+                           Thread(target=self.logstream, args=(llc_proc.stdout,)),
+                           Thread(target=self.logstream, args=(llc_proc.stderr,))]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+
+                llc_proc.wait()
+                opt_proc.wait()
+
+                # report the first tool that failed, llc also fails when opt gives it no input, but when llc
+                # exits early opt is only killed by the broken pipe
+                failed = [(proc, args) for proc, args in [(opt_proc, opt_args), (llc_proc, llc_args)]
+                          if proc.returncode]
+                if len(failed) == 2 and opt_proc.returncode == -getattr(signal, "SIGPIPE", 0):
+                    failed = failed[1:]
+                if failed:
+                    proc, args = failed[0]
+                    self.logger.error("command {} failed with error code {}".format(args[0], proc.returncode))
+                    raise EllBuildToolsRunException(cmdstr, self.output)
+        except FileNotFoundError:
+            raise EllBuildToolsRunException(cmdstr)
+
+        return out_file
+
     def compile(self, model_file, func_name, model_name, target, output_dir, skip_ellcode=False,
                 use_blas=False, fuse_linear_ops=True, optimize_reorder_data_nodes=True, profile=False, llvm_format="bc",
                 optimize=True, parallelize=True, vectorize=True, debug=False, is_model_file=False, swig=True,
@@ -20,9 +20,11 @@ try:
         os.path.join(script_path, '..', '..', '..', 'tools', 'utilities',
                      'pythonlibs'), '.', '..']
 
+    import wrap_builder_test
     import wrap_test
 
     tests = [
+        (wrap_builder_test.test, "wrap_builder_test"),
         (wrap_test.test, "wrap_test")
     ]
 except ImportError as err:
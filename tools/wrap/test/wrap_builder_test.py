@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+####################################################################################################
+#
+#  Project:  Embedded Learning Library (ELL)
+#  File:     wrap_builder_test.py
+#
+#  Requires: Python 3.x
+#
+####################################################################################################
+import hashlib
+import json
+import os
+import pathlib
+import platform
+import sys
+import tempfile
+import threading
+import unittest
+from shutil import copytree, rmtree
+from unittest import mock
+
+script_path = os.path.dirname(os.path.abspath(__file__))
+sys.path += [os.path.join(script_path, "..")]
+import wrap
+import buildtools
+
+
+class StubBuildTools:
+    """ stands in for buildtools.EllBuildTools, writes placeholder files instead of running the real tools """
+
+    def __init__(self, ell_root):
+        self.compiler = os.path.join(ell_root, "build", "bin", "compile")
+        self.blas = ""
+        self.logger = None
+        self.verbose = False
+        self.calls = []
+
+    def write(self, path, content):
+        with open(path, "w") as f:
+            f.write(content)
+
+    def compile(self, model_file, model_name, output_dir, llvm_format="bc", swig=True, header=False, **kwargs):
+        self.calls.append("compile")
+        base = os.path.join(output_dir, os.path.splitext(os.path.basename(model_file))[0])
+        with open(model_file) as f:
+            model = f.read()
+        out_file = base + {"bc": ".bc", "ir": ".ll", "asm": ".s", "obj": ".o"}[llvm_format]
+        self.write(out_file, model)
+        if header:
+            self.write(base + ".h", model)
+        if swig:
+            self.write(base + ".i", model_name)
+            self.write(base + ".i.h", model)
+        return out_file
+
+    def swig(self, output_dir, model_name, language, args=[]):
+        self.calls.append("swig")
+        base = os.path.join(output_dir, model_name + language.upper() + "_wrap")
+        self.write(base + ".cxx", "swig")
+        self.write(base + ".h", "swig")
+        with open(os.path.join(output_dir, model_name + ".i")) as f:
+            module_name = f.read()
+        self.write(os.path.join(output_dir, module_name + ".py"), "swig")
+
+    def opt(self, output_dir, input_file, optimization_level="3"):
+        self.calls.append("opt")
+        out_file = os.path.splitext(input_file)[0] + ".opt.bc"
+        self.write(out_file, "opt")
+        return out_file
+
+    def opt_and_llc_piped(self, output_dir, input_file, target, optimization_level="3", objext=".o"):
+        self.calls.append("opt_llc")
+        model_name = os.path.splitext(os.path.basename(input_file))[0]
+        out_file = os.path.join(output_dir, model_name + objext)
+        self.write(out_file, "opt_llc")
+        return out_file
+
+    def llc(self, output_dir, input_file, target, optimization_level="3", objext=".o"):
+        self.calls.append("llc")
+        model_name = os.path.splitext(os.path.basename(input_file))[0]
+        if model_name.endswith('.opt'):
+            model_name = model_name[:-4]
+        out_file = os.path.join(output_dir, model_name + objext)
+        self.write(out_file, "llc")
+        return out_file
+
+
+class WrapTestBase(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.ell_root = os.path.join(self.test_dir, "ell")
+        os.makedirs(os.path.join(self.ell_root, "CMake"))
+        with open(os.path.join(self.ell_root, "CMake", "OpenBLASSetup.cmake"), "w") as f:
+            f.write("# blas")
+        self.tools = StubBuildTools(self.ell_root)
+        patches = [mock.patch.object(wrap, "_cached_build_root", lambda cwd: os.path.join(self.ell_root, "build")),
+                   mock.patch.object(wrap, "_cached_tools", lambda ell_root: self.tools)]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        rmtree(self.test_dir, ignore_errors=True)
+
+    def write_model(self, name, content="model"):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def wrap(self, model_file, *args, includes=[]):
+        builder = wrap.ModuleBuilder()
+        builder.parse_command_line(["--model_file", model_file,
+                                    "--outdir", os.path.join(self.test_dir, "out")] + list(args))
+        builder.includes = list(includes)
+        builder.run()
+        self.builder = builder
+        calls = self.tools.calls
+        self.tools.calls = []
+        return calls
+
+
+class CompileCacheTest(WrapTestBase):
+    def setUp(self):
+        super(CompileCacheTest, self).setUp()
+        self.cache_dir = os.path.join(self.test_dir, "cache")
+
+    def test_miss_then_hit(self):
+        model = self.write_model("mymodel.ell")
+        self.assertIn("compile", self.wrap(model, "--cache_dir", self.cache_dir))
+        rmtree(os.path.join(self.test_dir, "out"))
+        self.assertNotIn("compile", self.wrap(model, "--cache_dir", self.cache_dir))
+        for ext in [".bc", ".i", ".i.h"]:
+            self.assertTrue(os.path.isfile(os.path.join(self.test_dir, "out", "mymodel" + ext)))
+
+    def test_store(self):
+        model = self.write_model("mymodel.ell")
+        self.wrap(model, "--cache_dir", self.cache_dir)
+        entries = os.listdir(self.cache_dir)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0], self.builder.cache_key())
+        self.assertEqual(sorted(os.listdir(os.path.join(self.cache_dir, entries[0]))),
+                         ["mymodel.bc", "mymodel.i", "mymodel.i.h"])
+
+    def test_changed_model_misses(self):
+        model = self.write_model("mymodel.ell", "model 1")
+        self.wrap(model, "--cache_dir", self.cache_dir)
+        self.write_model("mymodel.ell", "model 2")
+        self.assertIn("compile", self.wrap(model, "--cache_dir", self.cache_dir))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_model_file_name_is_part_of_key(self):
+        first = self.write_model("mymodel.ell")
+        second = self.write_model("other.ell")
+        self.wrap(first, "--cache_dir", self.cache_dir, "--module_name", "net")
+        self.assertIn("compile", self.wrap(second, "--cache_dir", self.cache_dir, "--module_name", "net"))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_existing_entry_is_not_a_warning(self):
+        model = self.write_model("mymodel.ell")
+        self.wrap(model, "--cache_dir", self.cache_dir)
+        cache_entry = os.path.join(self.cache_dir, self.builder.cache_key())
+        isdir = os.path.isdir
+        checked = []
+
+        def racing_isdir(path):
+            # the first check misses the entry, as if another build stored it right after
+            if path == cache_entry and not checked:
+                checked.append(path)
+                return False
+            return isdir(path)
+
+        with mock.patch.object(self.builder.logger, "warning") as warning:
+            self.builder.store_cached_compile(cache_entry, self.builder.get_compile_output_file())
+            with mock.patch("os.path.isdir", racing_isdir):
+                self.builder.store_cached_compile(cache_entry, self.builder.get_compile_output_file())
+        warning.assert_not_called()
+        self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(cache_entry)])
+
+
+class HashFileTest(WrapTestBase):
+    def test_matches_whole_file_hash(self):
+        content = "x" * ((1 << 20) + 17)
+        model = self.write_model("big.ell", content)
+        builder = wrap.ModuleBuilder()
+        expected = hashlib.blake2b(content.encode("utf-8"), digest_size=32).hexdigest()
+        self.assertEqual(builder._hash_file(model, digest_size=32).hexdigest(), expected)
+        with mock.patch.object(sys, "version_info", (3, 6)):
+            self.assertEqual(builder._hash_file(model, digest_size=32).hexdigest(), expected)
+
+    def test_cache_key_digest_size(self):
+        model = self.write_model("mymodel.ell")
+        self.wrap(model)
+        self.assertEqual(len(self.builder.cache_key()), 64)
+
+
+class TemplateTest(WrapTestBase):
+    def read_output(self, name):
+        with open(os.path.join(self.builder.output_dir, name)) as f:
+            return f.read()
+
+    def test_python_templates(self):
+        self.wrap(self.write_model("my-model.ell"))
+        cmake = self.read_output("CMakeLists.txt")
+        self.assertNotRegex(cmake, "@[A-Za-z_]+@")
+        self.assertIn("# Generated CMakeLists.txt for compiling the my-model module on host\n", cmake)
+        self.assertIn("#    >>> from out import my_model\n", cmake)
+        self.assertIn("project(my-model)\n", cmake)
+        self.assertIn("    set(target_name ${module_prefix}my_model)\n", cmake)
+        self.assertIn("        my-model.o\n        my-modelPYTHON_wrap.cxx\n", cmake)
+        init = self.read_output("__init__.py")
+        self.assertIn('print("Importing my_model")\nfrom . import my_model\n\n__all__ = [my_model]', init)
+
+    def test_cpp_templates(self):
+        self.wrap(self.write_model("my-model.ell"), "--language", "cpp", "--target", "pi3", "--module_name", "net")
+        cmake = self.read_output("CMakeLists.txt")
+        self.assertNotRegex(cmake, "@[A-Za-z_]+@")
+        self.assertIn("# Generated CMakeLists.txt for linking with the my-model static library on pi3\n", cmake)
+        self.assertIn("set(target_name net)\n", cmake)
+        self.assertIn("${CMAKE_CURRENT_SOURCE_DIR}/my-model.o)", cmake)
+        self.assertFalse(os.path.isfile(os.path.join(self.builder.output_dir, "__init__.py")))
+
+    def create_sample(self, target):
+        builder = wrap.ModuleBuilder()
+        builder.output_dir = os.path.join(self.test_dir, "out")
+        builder.model_file_base = "model"
+        builder.model_name = "model_name"
+        builder.target = target
+        builder.objext = "o"
+        builder.ell_root = "C:\\ell"
+        os.makedirs(builder.output_dir, exist_ok=True)
+        template_file = os.path.join(self.test_dir, "sample.in")
+        with open(template_file, "w") as f:
+            f.write("@ELL_outdir@ @ELL_model@ @ELL_model_name@ @Arch@ @OBJECT_EXTENSION@ "
+                    "@ELL_ROOT@ @SHELL_TYPE@ @Other@")
+        builder.create_template_file(template_file, "sample.txt")
+        with open(os.path.join(builder.output_dir, "sample.txt")) as f:
+            return f.read()
+
+    def test_sample_template(self):
+        self.assertEqual(self.create_sample("pi3"), "out model model_name pi3 o C:/ell/external UNIX @Other@")
+
+    def test_windows_host_shell_type(self):
+        with mock.patch.object(platform, "system", return_value="Windows"):
+            self.assertEqual(self.create_sample("host"),
+                             "out model model_name host o C:/ell/external WINDOWS @Other@")
+        with mock.patch.object(platform, "system", return_value="Linux"):
+            self.assertEqual(self.create_sample("host"), "out model model_name host o C:/ell/external UNIX @Other@")
+
+
+class CopyFilesTest(WrapTestBase):
+    def setUp(self):
+        super(CopyFilesTest, self).setUp()
+        self.source = os.path.join(self.test_dir, "header.h")
+        self.builder = wrap.ModuleBuilder()
+        self.builder.output_dir = os.path.join(self.test_dir, "out")
+        self.builder.logger = mock.Mock()
+        self.dest = os.path.join(self.builder.output_dir, "include", "header.h")
+
+    def write_source(self, content, mtime_ns):
+        with open(self.source, "w") as f:
+            f.write(content)
+        os.utime(self.source, ns=(mtime_ns, mtime_ns))
+
+    def read_dest(self):
+        with open(self.dest) as f:
+            return f.read()
+
+    def test_unchanged_file_is_skipped(self):
+        self.write_source("AAAA", 1000000000000000000)
+        self.builder.copy_files([self.source], "include")
+        with mock.patch.object(wrap, "copyfile") as copyfile:
+            self.builder.copy_files([self.source], "include")
+        copyfile.assert_not_called()
+
+    def test_rewrite_within_the_same_second_is_copied(self):
+        self.write_source("AAAA", 1000000000000000000)
+        self.builder.copy_files([self.source], "include")
+        self.write_source("BBBB", 1000000000500000000)
+        self.builder.copy_files([self.source], "include")
+        self.assertEqual(self.read_dest(), "BBBB")
+        self.assertEqual(os.stat(self.dest).st_mtime_ns, os.stat(self.source).st_mtime_ns)
+
+
+class UpToDateTest(WrapTestBase):
+    def setUp(self):
+        super(UpToDateTest, self).setUp()
+        self.model = self.write_model("mymodel.ell")
+        self.out_dir = os.path.join(self.test_dir, "out")
+        # use a private copy of the templates so the tests can edit them
+        templates_dir = os.path.join(self.test_dir, "templates")
+        copytree(str(wrap._TEMPLATES_DIR), templates_dir)
+        p = mock.patch.object(wrap, "_TEMPLATES_DIR", pathlib.Path(templates_dir))
+        p.start()
+        self.addCleanup(p.stop)
+        self.header = self.write_model("header.h", "// header")
+
+    def touch(self, path, content):
+        # make sure the new mtime differs even on file systems with coarse timestamps
+        stat = os.stat(path)
+        with open(path, "a") as f:
+            f.write(content)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2000000000))
+
+    def test_unchanged_run_is_skipped(self):
+        self.assertIn("compile", self.wrap(self.model, includes=[self.header]))
+        self.assertEqual(self.wrap(self.model, includes=[self.header]), [])
+
+    def test_force(self):
+        self.wrap(self.model)
+        self.assertIn("compile", self.wrap(self.model, "--force"))
+
+    def test_changed_option(self):
+        self.wrap(self.model)
+        self.assertIn("llc", self.wrap(self.model, "--optimization_level", "2"))
+
+    def test_edited_template(self):
+        self.wrap(self.model)
+        template = os.path.join(self.test_dir, "templates", "CMakeLists.python.txt.in")
+        self.touch(template, "# edited\n")
+        self.assertIn("compile", self.wrap(self.model))
+        with open(os.path.join(self.out_dir, "CMakeLists.txt")) as f:
+            self.assertTrue(f.read().endswith("# edited\n"))
+
+    def test_edited_include(self):
+        self.wrap(self.model, includes=[self.header])
+        self.touch(self.header, "// edited")
+        self.assertIn("compile", self.wrap(self.model, includes=[self.header]))
+        with open(os.path.join(self.out_dir, "include", "header.h")) as f:
+            self.assertEqual(f.read(), "// header// edited")
+
+    def test_added_include(self):
+        self.wrap(self.model, includes=[self.header])
+        other = self.write_model("other.h", "// other")
+        self.assertIn("compile", self.wrap(self.model, includes=[self.header, other]))
+        self.assertTrue(os.path.isfile(os.path.join(self.out_dir, "include", "other.h")))
+
+    def test_deleted_swig_output(self):
+        self.wrap(self.model, "--module_name", "net")
+        for name in ["mymodelPYTHON_wrap.cxx", "mymodelPYTHON_wrap.h", "net.py"]:
+            os.remove(os.path.join(self.out_dir, name))
+            self.assertIn("swig", self.wrap(self.model, "--module_name", "net"))
+
+    def test_stats_always_runs(self):
+        stats_file = os.path.join(self.out_dir, "wrap_stats.json")
+        self.wrap(self.model)
+        self.assertFalse(os.path.isfile(stats_file))
+        self.assertIn("compile", self.wrap(self.model, "--stats"))
+        self.assertTrue(os.path.isfile(stats_file))
+
+
+class SwigArgsTest(unittest.TestCase):
+    def setUp(self):
+        wrap._host_swig_args.cache_clear()
+        self.addCleanup(wrap._host_swig_args.cache_clear)
+
+    def test_targets(self):
+        expected = {
+            "pi3": ["-DSWIGWORDSIZE32", "-DLINUX"],
+            "pi0": ["-DSWIGWORDSIZE32", "-DLINUX"],
+            "orangepi0": ["-DSWIGWORDSIZE32", "-DLINUX"],
+            "pi3_64": ["-DSWIGWORDSIZE64", "-DLINUX"],
+            "aarch64": ["-DSWIGWORDSIZE64", "-DLINUX"]
+        }
+        targets = [t for t in wrap.ModuleBuilder.arguments["target"]["choices"] if t != "host"]
+        self.assertEqual(sorted(targets), sorted(expected.keys()))
+        for target in targets:
+            self.assertEqual(wrap._SWIG_TARGET_ARGS[target], expected[target], target)
+
+    def host_swig_args(self, platform_name, maxsize=2**63 - 1):
+        with mock.patch.object(sys, "platform", platform_name), mock.patch.object(sys, "maxsize", maxsize):
+            wrap._host_swig_args.cache_clear()
+            return wrap._host_swig_args()
+
+    def test_host(self):
+        self.assertEqual(self.host_swig_args("win32"), ["-DWIN32", "-DSWIGWORDSIZE32"])
+        self.assertEqual(self.host_swig_args("win32", 2**31 - 1), ["-DWIN32", "-DSWIGWORDSIZE32"])
+        self.assertEqual(self.host_swig_args("linux"), ["-DLINUX", "-DSWIGWORDSIZE64"])
+        self.assertEqual(self.host_swig_args("linux", 2**31 - 1), ["-DLINUX", "-DSWIGWORDSIZE32"])
+        self.assertEqual(self.host_swig_args("darwin"), ["-DAPPLE"])
+        self.assertEqual(self.host_swig_args("freebsd12"), [])
+
+
+class ParserSpecTest(unittest.TestCase):
+    def test_spec(self):
+        spec = dict(wrap._make_parser_spec(wrap.ModuleBuilder.arguments))
+        self.assertEqual(spec[("--model_file", "-f")],
+                         {"help": "path to the ELL model file", "type": str, "required": True})
+        self.assertEqual(spec[("--module_name", "-n")],
+                         {"help": "the name of the output module (defaults to the model filename)", "type": str,
+                          "default": None})
+        self.assertEqual(spec[("--target", "-t")],
+                         {"help": "the target platform", "type": str, "default": "host",
+                          "choices": ["pi3", "pi0", "orangepi0", "pi3_64", "aarch64", "host"]})
+        self.assertEqual(spec[("--verbose", "-v")],
+                         {"help": "print verbose output", "action": "store_true", "default": False})
+        self.assertEqual(spec[("--global_value_alignment", "-gva")],
+                         {"help": "The number of bytes to align global buffers to", "type": int, "default": 32})
+
+    def test_spec_order(self):
+        flags = [flags[0] for flags, _ in wrap._make_parser_spec(wrap.ModuleBuilder.arguments)]
+        self.assertEqual(flags, ["--" + arg for arg in wrap.ModuleBuilder.arguments])
+
+    def test_subclass_arguments(self):
+        class CustomBuilder(wrap.ModuleBuilder):
+            arguments = dict(wrap.ModuleBuilder.arguments)
+            arguments["custom"] = {"short": "custom", "default": False, "help": "a custom flag"}
+
+        args = CustomBuilder._get_parser().parse_args(["-f", "model.ell", "--custom"])
+        self.assertTrue(args.custom)
+        self.assertNotIn("custom", vars(wrap.ModuleBuilder._get_parser().parse_args(["-f", "model.ell"])))
+
+    def test_parser_cached_per_class(self):
+        class CustomBuilder(wrap.ModuleBuilder):
+            pass
+
+        parser = wrap.ModuleBuilder._get_parser()
+        custom_parser = CustomBuilder._get_parser()
+        self.assertIsNot(parser, custom_parser)
+        self.assertIs(wrap.ModuleBuilder._get_parser(), parser)
+        self.assertIs(CustomBuilder._get_parser(), custom_parser)
+
+
+class JobsTest(WrapTestBase):
+    def wrap_with_waiting_swig(self, *args, timeout=10):
+        """ swig waits until opt has started, which only happens if the two run at the same time """
+        model = self.write_model("mymodel.ell")
+        opt_started = threading.Event()
+        swig, opt = self.tools.swig, self.tools.opt
+
+        def waiting_swig(*args, **kwargs):
+            if not opt_started.wait(timeout=timeout):
+                raise Exception("swig did not run at the same time as opt")
+            return swig(*args, **kwargs)
+
+        def signalling_opt(*args, **kwargs):
+            opt_started.set()
+            return opt(*args, **kwargs)
+
+        with mock.patch.object(self.tools, "swig", waiting_swig), mock.patch.object(self.tools, "opt", signalling_opt):
+            return self.wrap(model, *args)
+
+    def test_swig_runs_alongside_opt(self):
+        self.assertIn("swig", self.wrap_with_waiting_swig("--jobs", "2", "--stats"))
+        with open(os.path.join(self.test_dir, "out", "wrap_stats.json")) as f:
+            self.assertIn("swig", json.load(f))
+
+    def test_single_job_runs_swig_first(self):
+        # opt can never start while swig is waiting, so this always times out
+        with self.assertRaisesRegex(Exception, "swig did not run at the same time as opt"):
+            self.wrap_with_waiting_swig("--jobs", "1", timeout=0.1)
+
+    def test_opt_failure_waits_for_swig(self):
+        model = self.write_model("mymodel.ell")
+        with mock.patch.object(self.tools, "opt", side_effect=Exception("opt failed")):
+            with self.assertRaises(Exception):
+                self.wrap(model, "--jobs", "2")
+        self.assertTrue(os.path.isfile(os.path.join(self.test_dir, "out", "mymodelPYTHON_wrap.cxx")))
+
+
+class PipelineTest(WrapTestBase):
+    def test_pipeline(self):
+        self.assertEqual(self.wrap(self.write_model("mymodel.ell"), "--pipeline", "--stats"),
+                         ["compile", "swig", "opt_llc"])
+        self.assertTrue(os.path.isfile(os.path.join(self.test_dir, "out", "mymodel.o")))
+        with open(os.path.join(self.test_dir, "out", "wrap_stats.json")) as f:
+            stats = json.load(f)
+        self.assertIn("opt_llc", stats)
+        self.assertNotIn("opt", stats)
+        self.assertNotIn("llc", stats)
+
+    def test_no_opt_tool(self):
+        self.assertEqual(self.wrap(self.write_model("mymodel.ell"), "--pipeline", "--no_opt_tool"),
+                         ["compile", "swig", "llc"])
+
+    def test_no_llc_tool(self):
+        self.assertEqual(self.wrap(self.write_model("mymodel.ell"), "--pipeline", "--no_llc_tool"),
+                         ["compile", "swig", "opt"])
+
+
+@unittest.skipIf(os.name == "nt", "the fake opt and llc tools are shell scripts")
+class PipedToolsTest(unittest.TestCase):
+    """ runs EllBuildTools.opt_and_llc_piped against small shell scripts standing in for opt and llc """
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(rmtree, self.test_dir, ignore_errors=True)
+        self.input_file = os.path.join(self.test_dir, "model.bc")
+        with open(self.input_file, "w") as f:
+            f.write("bitcode")
+        with mock.patch.object(buildtools.EllBuildTools, "find_tools"):
+            self.tools = buildtools.EllBuildTools(self.test_dir)
+        self.tools.logger = mock.Mock()
+        # opt writes its input to stdout, llc writes stdin to the -o file and fails if it gets no input
+        self.opt = self.write_tool("opt", 'echo "opt warning" >&2\ncat "$1"\n')
+        self.llc = self.write_tool("llc", 'data=$(cat)\n[ -n "$data" ] || exit 1\nprintf "%s" "$data" > "$3"\n')
+        self.tools.optexe = self.opt
+        self.tools.llcexe = self.llc
+
+    def write_tool(self, name, body):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "w") as f:
+            f.write("#!/bin/sh\n" + body)
+        os.chmod(path, 0o755)
+        return path
+
+    def run_tools(self):
+        return self.tools.opt_and_llc_piped(self.test_dir, self.input_file, "host", "3", ".o")
+
+    def assert_failed(self, tool):
+        with self.assertRaises(buildtools.EllBuildToolsRunException):
+            self.run_tools()
+        self.tools.logger.error.assert_called_once()
+        self.assertIn("command {} failed".format(tool), self.tools.logger.error.call_args[0][0])
+
+    def test_success(self):
+        out_file = self.run_tools()
+        self.assertEqual(out_file, os.path.join(self.test_dir, "model.o"))
+        with open(out_file) as f:
+            self.assertEqual(f.read(), "bitcode")
+        self.assertIn("opt warning", self.tools.output)
+        for log in ["opt.log", "llc.log"]:
+            self.assertTrue(os.path.isfile(os.path.join(self.test_dir, log)))
+
+    def test_llc_failure(self):
+        self.tools.llcexe = self.write_tool("llc2", "cat > /dev/null\nexit 3\n")
+        self.assert_failed(self.tools.llcexe)
+
+    def test_opt_failure(self):
+        # llc also fails because it gets no input, but opt is the tool to blame
+        self.tools.optexe = self.write_tool("opt2", "exit 2\n")
+        self.assert_failed(self.tools.optexe)
+
+
+def test():
+    suite = unittest.TestLoader().loadTestsFromModule(sys.modules[__name__])
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,13 +10,20 @@
 ####################################################################################################
 
 import argparse
+import copy
+import functools
+import hashlib
 import json
 import logging
 import os
+import pathlib
 import platform
+import re
 import sys
+import tempfile
 import time
-from shutil import copyfile
+from concurrent.futures import ThreadPoolExecutor
+from shutil import copyfile, rmtree
 
 __script_path = os.path.dirname(os.path.abspath(__file__))
 sys.path += [os.path.join(__script_path, "..", "utilities", "pythonlibs")]
@@ -28,6 +35,76 @@ import logger
 # This script creates a compilable Python project for executing a given ELL model on a target platform.
 # Compilation of the resulting project will require a C++ compiler.
 
+_TEMPLATES_DIR = pathlib.Path(__file__).resolve().parent / "templates"
+
+# The ModuleBuilder fields that change the output of the ELL compiler, these are hashed into the cache key.
+_COMPILE_OPTIONS = ["model_file_base", "model_name", "func_name", "target", "skip_ellcode", "blas", "fuse_linear_ops",
+                    "optimize_reorder", "profile", "llvm_format", "optimize", "parallelize", "vectorize", "debug",
+                    "swig", "cpp_header", "objext", "global_value_alignment", "compile_args"]
+
+# The ModuleBuilder fields that change the rest of the build, these are recorded in the output manifest.
+_BUILD_OPTIONS = ["language", "no_opt_tool", "no_llc_tool", "optimization_level", "pipeline", "ell_root"]
+
+# Records the inputs and outputs of the last successful run, used to skip runs when nothing has changed.
+_MANIFEST_FILE = ".wrap_manifest.json"
+
+# The @name@ variables that are filled in when creating files from the templates folder.
+_PLACEHOLDER_RE = re.compile(r"@(ELL_outdir|ELL_model|ELL_model_name|Arch|OBJECT_EXTENSION|ELL_ROOT|SHELL_TYPE)@")
+
+# The swig preprocessor definitions for each cross compilation target, see _host_swig_args for the host.
+_SWIG_TARGET_ARGS = {
+    "pi3": ["-DSWIGWORDSIZE32", "-DLINUX"],
+    "pi0": ["-DSWIGWORDSIZE32", "-DLINUX"],
+    "orangepi0": ["-DSWIGWORDSIZE32", "-DLINUX"],
+    "pi3_64": ["-DSWIGWORDSIZE64", "-DLINUX"],
+    "aarch64": ["-DSWIGWORDSIZE64", "-DLINUX"]
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _host_swig_args():
+    if sys.platform.startswith('win32'):
+        # SWIG expects 32-bit, regardless of bitness for Windows
+        # (because INT_MAX == LONG_MAX on Windows)
+        return ["-DWIN32", "-DSWIGWORDSIZE32"]
+    if sys.platform.startswith('linux'):
+        if sys.maxsize > 2**32:
+            return ["-DLINUX", "-DSWIGWORDSIZE64"]
+        return ["-DLINUX", "-DSWIGWORDSIZE32"]
+    if sys.platform.startswith('darwin'):
+        return ["-DAPPLE"]
+    return []  # raise exception?
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_build_root(cwd):
+    # find_ell_build searches from the current directory, so the result is cached per directory
+    return find_ell.find_ell_build()
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_tools(ell_root):
+    return buildtools.EllBuildTools(ell_root)
+
+
+def _make_parser_spec(arguments):
+    """ turn a table of argument definitions into a list of (flags, kwargs) to pass to add_argument """
+    spec = []
+    for arg, argdef in arguments.items():
+        flags = ("--" + arg, "-" + argdef["short"])
+        kwargs = {"help": argdef["help"]}
+        arg_type = argdef.get("type", str)
+        if "required" in argdef:
+            kwargs.update(type=arg_type, required=True)
+        elif "choices" in argdef:
+            kwargs.update(type=arg_type, default=argdef["default"], choices=argdef["choices"])
+        elif type(argdef["default"]) is bool and not argdef["default"]:
+            kwargs.update(action="store_true", default=False)
+        else:
+            kwargs.update(type=arg_type, default=argdef["default"])
+        spec.append((flags, kwargs))
+    return spec
+
 
 class _PassArgsParser(argparse.ArgumentParser):
     def __init__(self, *args, **kwargs):
@@ -180,6 +257,33 @@ If '0' or 'g', opt is not run (default '3')",
             "short": "stats",
             "default": False,
             "help": "write compiler performance stats to 'wrap_stats.json' file"
+        },
+        "cache_dir":
+        {
+            "short": "cache_dir",
+            "default": None,
+            "help": "cache the compiled model in this directory (e.g. ~/.cache/ell-wrap) so that repeated builds \
+of an unchanged model can skip the compile step"
+        },
+        "jobs":
+        {
+            "short": "j",
+            "default": 1,
+            "help": "the number of build steps to run in parallel, if greater than 1 swig runs \
+at the same time as opt and llc (default 1)",
+            "type": int
+        },
+        "pipeline":
+        {
+            "short": "pipeline",
+            "default": False,
+            "help": "pipe the output of LLVM's opt tool directly into llc instead of writing it to disk"
+        },
+        "force":
+        {
+            "short": "force",
+            "default": False,
+            "help": "rebuild even if the output directory is up to date"
         }
     }
 
@@ -208,6 +312,10 @@ If '0' or 'g', opt is not run (default '3')",
         self.objext = "o"
         self.logger = None
         self.skip_ellcode = False
+        self.cache_dir = None
+        self.jobs = 1
+        self.pipeline = False
+        self.force = False
 
     def str2bool(self, v):
         return v.lower() in ("yes", "true", "t", "1")
@@ -215,7 +323,10 @@ If '0' or 'g', opt is not run (default '3')",
     def get_objext(self, target):
         return "o"
 
-    def parse_command_line(self, args=None):
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _get_parser(cls):
+        """ build the command line parser from cls.arguments, this is done once per class """
         arg_parser = _PassArgsParser(prog="wrap", description="""This tool wraps a given ELL model in a CMake buildable \
 project that builds a language specific module that can call the ELL model on a given target platform.
 The supported languages are:
@@ -228,33 +339,20 @@ The supported target platforms are:
     aarch64   arm64 Linux, works on Qualcomm DragonBoards
     host      (default) your host computer architecture""")
 
-        for arg in self.arguments.keys():
-            argdef = self.arguments[arg]
-            arg_type = str
-            if "type" in argdef.keys():
-                arg_type = argdef["type"]
-            if "required" in argdef.keys():
-                arg_parser.add_argument("--" + arg, "-" + argdef["short"],
-                                        help=argdef["help"], type=arg_type, required=True)
-            elif "choices" in argdef.keys():
-                arg_parser.add_argument("--" + arg, "-" + argdef["short"],
-                                        help=argdef["help"], type=arg_type, default=argdef["default"],
-                                        choices=argdef["choices"])
-            elif type(argdef["default"]) is bool and not argdef["default"]:
-                arg_parser.add_argument("--" + arg, "-" + argdef["short"],
-                                        help=argdef["help"], action="store_true", default=False)
-            else:
-                arg_parser.add_argument("--" + arg, "-" + argdef["short"],
-                                        help=argdef["help"], type=arg_type, default=argdef["default"])
+        for flags, kwargs in _make_parser_spec(cls.arguments):
+            arg_parser.add_argument(*flags, **kwargs)
+
+        logger.add_logging_args(arg_parser)
+        return arg_parser
 
+    def parse_command_line(self, args=None):
         compile_args = []
         if '--' in args:
             index = args.index('--')
             compile_args = args[index + 1:]
             args = args[:index]
 
-        logger.add_logging_args(arg_parser)
-        args = arg_parser.parse_args(args)
+        args = self._get_parser().parse_args(args)
         self.logger = logger.setup(args)
 
         self.model_file = args.model_file
@@ -294,19 +392,22 @@ Please specify a different outdir.".format(self.output_dir + ".py", self.output_
         self.compile_args = compile_args
         self.global_value_alignment = args.global_value_alignment
         self.stats = args.stats
+        self.cache_dir = args.cache_dir
+        self.jobs = args.jobs
+        self.pipeline = args.pipeline
+        self.force = args.force
         self.times = {}
 
     def find_files(self):
-        __script_path = os.path.dirname(os.path.abspath(__file__))
-        self.cmake_template = os.path.join(__script_path, "templates/CMakeLists.%s.txt.in" % (self.language))
+        self.cmake_template = _TEMPLATES_DIR / f"CMakeLists.{self.language}.txt.in"
 
-        if not os.path.isfile(self.cmake_template):
+        if not self.cmake_template.is_file():
             raise Exception("Could not find CMakeLists template: %s" % (self.cmake_template))
 
         if self.language == "python":
-            self.module_init_template = os.path.join(__script_path, "templates/__init__.py.in")
+            self.module_init_template = _TEMPLATES_DIR / "__init__.py.in"
 
-            if not os.path.isfile(self.module_init_template):
+            if not self.module_init_template.is_file():
                 raise Exception("Could not find __init__.py template: %s" % (self.module_init_template))
 
         self.files.append(os.path.join(self.ell_root, "CMake/OpenBLASSetup.cmake"))
@@ -323,28 +424,47 @@ Please specify a different outdir.".format(self.output_dir + ".py", self.output_
             if not os.path.isfile(path):
                 raise Exception("expected file not found: " + path)
 
+        def copy_file(path):
             _, file_name = os.path.split(path)
             dest = os.path.join(target_dir, file_name)
 
+            # skip the copy if the destination is unchanged since the last run
+            src_stat = os.stat(path)
+            try:
+                dest_stat = os.stat(dest)
+                if src_stat.st_size == dest_stat.st_size and src_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+                    return
+            except FileNotFoundError:
+                pass
+
             if self.verbose:
                 self.logger.info("copy \"%s\" \"%s\"" % (path, dest))
 
             copyfile(path, dest)
+            # give the copy the same timestamp as the source so the next run can skip it
+            os.utime(dest, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+        # copying is I/O bound so the files are copied in parallel
+        with ThreadPoolExecutor(max_workers=min(8, len(filelist) or 1)) as executor:
+            list(executor.map(copy_file, filelist))
 
     def create_template_file(self, template_filename, output_filename):
         with open(template_filename) as f:
             template = f.read()
 
-        template = template.replace("@ELL_outdir@", os.path.basename(self.output_dir))
-        template = template.replace("@ELL_model@", self.model_file_base)
-        template = template.replace("@ELL_model_name@", self.model_name)
-        template = template.replace("@Arch@", self.target)
-        template = template.replace("@OBJECT_EXTENSION@", self.objext)
-        template = template.replace("@ELL_ROOT@", os.path.join(self.ell_root, "external").replace("\\", "/"))
         shell_type = "UNIX"
         if self.target == "host" and platform.system() == "Windows":
             shell_type = "WINDOWS"
-        template = template.replace("@SHELL_TYPE@", shell_type)
+        values = {
+            "ELL_outdir": os.path.basename(self.output_dir),
+            "ELL_model": self.model_file_base,
+            "ELL_model_name": self.model_name,
+            "Arch": self.target,
+            "OBJECT_EXTENSION": self.objext,
+            "ELL_ROOT": os.path.join(self.ell_root, "external").replace("\\", "/"),
+            "SHELL_TYPE": shell_type
+        }
+        template = _PLACEHOLDER_RE.sub(lambda m: values[m.group(1)], template)
         output_template = os.path.join(self.output_dir, output_filename)
         with open(output_template, 'w') as f:
             f.write(template)
@@ -358,99 +478,240 @@ Please specify a different outdir.".format(self.output_dir + ".py", self.output_
     def save_config(self):
         self.config['model'] = self.model_name
         self.config['func'] = self.model_name + "_" + self.func_name
-        config_json = json.dumps(self.config, indent=2, sort_keys=True)
         _, tail = os.path.split(self.config_file)
         outputFile = os.path.join(self.output_dir, tail)
         self.logger.info("creating config file: '" + outputFile + "'")
         with open(outputFile, 'w') as f:
-            f.write(config_json)
-            f.close()
+            json.dump(self.config, f, indent=2, sort_keys=True)
+
+    def _hash_file(self, path, algo="blake2b", **kwargs):
+        """ return a hash object for the contents of the given file, the file is read in fixed size chunks
+        so that large models are never held in memory all at once. Extra arguments such as digest_size are
+        passed to the hash constructor """
+        with open(path, 'rb', buffering=0) as f:
+            if sys.version_info >= (3, 11):
+                return hashlib.file_digest(f, lambda: hashlib.new(algo, **kwargs))
+            h = hashlib.new(algo, **kwargs)
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+            return h
+
+    def cache_key(self):
+        """ return a hash of the model file contents and all the options that affect the compiler output """
+        h = self._hash_file(self.model_file, digest_size=32)
+        options = {name: getattr(self, name) for name in _COMPILE_OPTIONS}
+        # rebuilding ELL can change the compiler output, so the compiler itself is part of the key
+        options["compiler"] = self.tools.compiler
+        if os.path.isfile(self.tools.compiler):
+            options["compiler_mtime"] = os.stat(self.tools.compiler).st_mtime_ns
+        # the compiler only uses BLAS on the host if the ELL build found a BLAS library
+        options["blas_libs"] = self.tools.blas
+        h.update(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+        return h.hexdigest()
+
+    def get_compile_output_file(self):
+        output_ext = {
+            "bc": ".bc",
+            "ir": ".ll",
+            "asm": ".s",
+            "obj": "." + self.objext
+        }[self.llvm_format]
+        return os.path.join(self.output_dir, self.model_file_base + output_ext)
+
+    def get_compile_outputs(self, out_file):
+        outputs = [out_file]
+        base = os.path.join(self.output_dir, self.model_file_base)
+        if self.cpp_header:
+            outputs += [base + ".h"]
+        if self.swig:
+            outputs += [base + ".i", base + ".i.h"]
+        return outputs
+
+    def get_swig_outputs(self):
+        # swig names the wrapper after the model file and the generated module after the module name
+        wrapper = os.path.join(self.output_dir, self.model_file_base + self.language.upper() + "_wrap")
+        return [wrapper + ".cxx", wrapper + ".h", os.path.join(self.output_dir, self.model_name + ".py")]
+
+    def restore_cached_compile(self, cache_entry):
+        """ copy a previously cached compiler output into the output directory, returns None on a cache miss """
+        out_file = self.get_compile_output_file()
+        if not os.path.isfile(os.path.join(cache_entry, os.path.basename(out_file))):
+            return None
+        self.logger.info("using cached compiler output from '{}'".format(cache_entry))
+        for name in os.listdir(cache_entry):
+            copyfile(os.path.join(cache_entry, name), os.path.join(self.output_dir, name))
+        return out_file
+
+    def store_cached_compile(self, cache_entry, out_file):
+        """ save the compiler output in the cache, the entry is filled in a temp folder then renamed into place
+        so that concurrent builds never see a partially written entry """
+        if os.path.isdir(cache_entry):
+            return
+        cache_root = os.path.dirname(cache_entry)
+        temp_dir = None
+        try:
+            os.makedirs(cache_root, exist_ok=True)
+            temp_dir = tempfile.mkdtemp(dir=cache_root)
+            for path in self.get_compile_outputs(out_file):
+                copyfile(path, os.path.join(temp_dir, os.path.basename(path)))
+            os.rename(temp_dir, cache_entry)
+            temp_dir = None
+        except OSError as e:
+            # another build may have stored the same entry first, that entry is just as good as this one
+            if not os.path.isdir(cache_entry):
+                self.logger.warning("could not cache compiler output in '{}': {}".format(cache_entry, e))
+        finally:
+            if temp_dir:
+                rmtree(temp_dir, ignore_errors=True)
+
+    def get_file_stamp(self, path):
+        try:
+            stat = os.stat(path)
+            return [str(path), stat.st_size, stat.st_mtime_ns]
+        except FileNotFoundError:
+            return [str(path), None, None]
+
+    def build_key(self, cache_key):
+        """ return a hash of the cache key and the options that affect the rest of the build """
+        options = {name: getattr(self, name) for name in _BUILD_OPTIONS}
+        options["cache_key"] = cache_key
+        # the templates and the files copied into the output folder are inputs to the build too
+        sources = [self.cmake_template]
+        if self.language == "python":
+            sources += [self.module_init_template]
+        options["sources"] = [self.get_file_stamp(path) for path in sources + self.files + self.includes]
+        return hashlib.blake2b(json.dumps(options, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def is_up_to_date(self, key):
+        """ return True if the manifest from the last run has the same key and none of its outputs have changed """
+        try:
+            with open(os.path.join(self.output_dir, _MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if manifest.get("key") != key:
+            return False
+        for name, mtime_ns in manifest.get("outputs", {}).items():
+            try:
+                if os.stat(os.path.join(self.output_dir, name)).st_mtime_ns != mtime_ns:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+    def write_manifest(self, key, outputs):
+        manifest = {
+            "key": key,
+            "outputs": {os.path.relpath(path, self.output_dir): os.stat(path).st_mtime_ns for path in outputs}
+        }
+        with open(os.path.join(self.output_dir, _MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
 
     def start_timer(self, name):
-        self.times[name] = time.time()
+        self.times[name] = {"start": time.perf_counter(), "elapsed": None}
 
     def stop_timer(self, name):
-        self.times[name] = time.time() - self.times[name]
+        timer = self.times[name]
+        timer["elapsed"] = time.perf_counter() - timer["start"]
 
     def write_stats(self):
         if self.stats:
             filename = os.path.join(self.output_dir, "wrap_stats.json")
-            with open(filename, 'w') as f:
-                json.dump(self.times, f, indent=2)
+            with open(filename, 'w', buffering=1 << 16) as f:
+                json.dump({name: timer["elapsed"] for name, timer in self.times.items()}, f, indent=2)
+
+    def run_swig(self, tools, args):
+        self.start_timer("swig")
+        tools.swig(self.output_dir, self.model_file_base, self.language, args)
+        self.stop_timer("swig")
 
     def run(self):
-        self.build_root = find_ell.find_ell_build()
+        self.build_root = _cached_build_root(os.getcwd())
         self.ell_root = os.path.dirname(self.build_root)
-        self.tools = buildtools.EllBuildTools(self.ell_root)
+        self.tools = _cached_tools(self.ell_root)
+        # the tools may have been created by an earlier build, so point them at the logger for this one
+        self.tools.logger = self.logger
+        self.tools.verbose = self.logger.getVerbose()
         self.find_files()
+        cache_key = self.cache_key()
+        build_key = self.build_key(cache_key)
+        # --stats always runs the build so that wrap_stats.json describes this run
+        if not self.force and not self.stats and self.is_up_to_date(build_key):
+            self.logger.info("'{}' is up-to-date, skipping".format(self.output_dir))
+            return
         self.copy_files(self.files, "")
         self.copy_files(self.includes, "include")
         self.start_timer("compile")
-        out_file = self.tools.compile(
-            model_file=self.model_file,
-            func_name=self.func_name,
-            model_name=self.model_name,
-            target=self.target,
-            skip_ellcode=self.skip_ellcode,
-            output_dir=self.output_dir,
-            use_blas=self.blas,
-            fuse_linear_ops=self.fuse_linear_ops,
-            optimize_reorder_data_nodes=self.optimize_reorder,
-            profile=self.profile,
-            llvm_format=self.llvm_format,
-            optimize=self.optimize,
-            parallelize=self.parallelize,
-            vectorize=self.vectorize,
-            debug=self.debug,
-            is_model_file=False,
-            swig=self.swig,
-            header=self.cpp_header,
-            objext="." + self.objext,
-            global_value_alignment=self.global_value_alignment,
-            extra_options=self.compile_args)
+        out_file = None
+        cache_entry = None
+        if self.cache_dir:
+            cache_entry = os.path.join(os.path.expanduser(self.cache_dir), cache_key)
+            out_file = self.restore_cached_compile(cache_entry)
+        if not out_file:
+            out_file = self.tools.compile(
+                model_file=self.model_file,
+                func_name=self.func_name,
+                model_name=self.model_name,
+                target=self.target,
+                skip_ellcode=self.skip_ellcode,
+                output_dir=self.output_dir,
+                use_blas=self.blas,
+                fuse_linear_ops=self.fuse_linear_ops,
+                optimize_reorder_data_nodes=self.optimize_reorder,
+                profile=self.profile,
+                llvm_format=self.llvm_format,
+                optimize=self.optimize,
+                parallelize=self.parallelize,
+                vectorize=self.vectorize,
+                debug=self.debug,
+                is_model_file=False,
+                swig=self.swig,
+                header=self.cpp_header,
+                objext="." + self.objext,
+                global_value_alignment=self.global_value_alignment,
+                extra_options=self.compile_args)
+            if cache_entry:
+                self.store_cached_compile(cache_entry, out_file)
         self.stop_timer("compile")
-        if self.swig:
-            self.start_timer("swig")
-            args = []
-            if self.target in ["pi3", "pi0", "orangepi0"]:
-                args += ["-DSWIGWORDSIZE32", "-DLINUX"]
-            elif self.target in ["pi3_64", "aarch64"]:
-                args += ["-DSWIGWORDSIZE64", "-DLINUX"]
-            elif self.target == "host":
-                from sys import maxsize
-                if sys.platform.startswith('win32'):
-                    args += ["-DWIN32"]
-                    # SWIG expects 32-bit, regardless of bitness for Windows
-                    # (because INT_MAX == LONG_MAX on Windows)
-                    args += ["-DSWIGWORDSIZE32"]
+        outputs = self.get_compile_outputs(out_file)
+        # swig only depends on the compiler output, so with --jobs it runs while opt and llc work on the model
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            swig_future = None
+            if self.swig:
+                args = list(_SWIG_TARGET_ARGS.get(self.target) or _host_swig_args())
+                if self.jobs > 1:
+                    # swig gets its own copy of the tools because EllBuildTools.run collects output on the instance
+                    swig_future = executor.submit(self.run_swig, copy.copy(self.tools), args)
                 else:
-                    if sys.platform.startswith('linux'):
-                        args += ["-DLINUX"]
-                        if maxsize > 2**32:
-                            args += ["-DSWIGWORDSIZE64"]
-                        else:
-                            args += ["-DSWIGWORDSIZE32"]
-                    elif sys.platform.startswith('darwin'):
-                        args += ["-DAPPLE"]
-                    else:
-                        pass  # raise exception?
+                    self.run_swig(self.tools, args)
+            if self.pipeline and not self.no_opt_tool and not self.no_llc_tool:
+                self.start_timer("opt_llc")
+                out_file = self.tools.opt_and_llc_piped(self.output_dir, out_file, self.target,
+                                                        self.optimization_level, "." + self.objext)
+                self.stop_timer("opt_llc")
             else:
-                pass  # raise exception?
-            self.tools.swig(self.output_dir, self.model_file_base, self.language, args)
-            self.stop_timer("swig")
-        if not self.no_opt_tool:
-            self.start_timer("opt")
-            out_file = self.tools.opt(self.output_dir, out_file, self.optimization_level)
-            self.stop_timer("opt")
-        if not self.no_llc_tool:
-            self.start_timer("llc")
-            out_file = self.tools.llc(self.output_dir, out_file, self.target, self.optimization_level,
-                                      "." + self.objext)
-            self.stop_timer("llc")
+                if not self.no_opt_tool:
+                    self.start_timer("opt")
+                    out_file = self.tools.opt(self.output_dir, out_file, self.optimization_level)
+                    self.stop_timer("opt")
+                if not self.no_llc_tool:
+                    self.start_timer("llc")
+                    out_file = self.tools.llc(self.output_dir, out_file, self.target, self.optimization_level,
+                                              "." + self.objext)
+                    self.stop_timer("llc")
+            if swig_future:
+                swig_future.result()
         self.write_stats()
         self.create_cmake_file()
+        outputs += [out_file, os.path.join(self.output_dir, "CMakeLists.txt")]
         if self.language == "python":
             self.create_module_init_file()
+            outputs += [os.path.join(self.output_dir, "__init__.py")]
+        if self.swig:
+            outputs += self.get_swig_outputs()
+        outputs += [os.path.join(self.output_dir, os.path.basename(path)) for path in self.files]
+        outputs += [os.path.join(self.output_dir, "include", os.path.basename(path)) for path in self.includes]
+        self.write_manifest(build_key, outputs)
         if self.target == "host":
             self.logger.info("success, now you can build the '" + self.output_dir + "' folder")
         else: